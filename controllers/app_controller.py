@@ -32,9 +32,38 @@ class AppController:
         if success:
             self.update_all_views()
             messagebox.showinfo("Thông báo", "Đã tải dữ liệu thành công!")
+            self.show_quality_report()
         else:
             messagebox.showerror("Lỗi", f"Không thể tải dữ liệu: {message}")
     
+    def show_quality_report(self):
+        """Hiển thị cảnh báo nếu dữ liệu vừa tải/nhập có lỗi"""
+        lines = self.model.get_quality_summary()
+        if lines:
+            messagebox.showwarning("Kiểm tra dữ liệu", "Phát hiện dữ liệu bất thường:\n" + "\n".join(lines))
+    
+    def import_data(self):
+        """Nhập thêm thí sinh từ file CSV"""
+        from tkinter import filedialog
+        file_path = filedialog.askopenfilename(
+            title="Chọn file CSV cần nhập",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        
+        success, message = self.model.import_data(file_path)
+        if success:
+            messagebox.showinfo("Thông báo", message)
+            self.update_data_view()
+            self.update_overview()
+        else:
+            messagebox.showerror("Lỗi", f"Không thể nhập dữ liệu: {message}")
+        
+        # Chỉ hiển thị báo cáo khi file nhập đã được quét
+        if self.model.get_quality_report() is not None:
+            self.show_quality_report()
+    
     def update_all_views(self):
         """Cập nhật tất cả các view"""
         self.update_overview()
@@ -58,6 +87,10 @@ class AppController:
         
         student = self.model.search_by_sbd(sbd)
         self.view.update_search_result(student, self.model.subjects_dict)
+        
+        # Hiển thị thứ hạng của thí sinh bên cạnh kết quả tìm kiếm
+        if student is not None and hasattr(self.view, 'update_search_rank'):
+            self.view.update_search_rank(self.model.get_student_rank(student))
     
     def analyze_subject(self, subject_name):
         """Phân tích thống kê cho một môn học"""
@@ -152,6 +185,26 @@ class AppController:
                 messagebox.showerror("Lỗi", f"Không thể xóa thí sinh: {message}")
         return False
     
+    def undo(self):
+        """Hoàn tác chỉnh sửa gần nhất"""
+        success, message = self.model.undo()
+        if success:
+            self.update_data_view()
+            self.update_overview()
+        else:
+            messagebox.showwarning("Cảnh báo", message)
+        return success
+    
+    def redo(self):
+        """Làm lại chỉnh sửa vừa hoàn tác"""
+        success, message = self.model.redo()
+        if success:
+            self.update_data_view()
+            self.update_overview()
+        else:
+            messagebox.showwarning("Cảnh báo", message)
+        return success
+    
     def search_data(self, search_text):
         """Tìm kiếm dữ liệu theo từ khóa"""
         if self.model.df is None:
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module mô phỏng điểm chuẩn xét tuyển
+
+Module này chứa lớp AdmissionModel tìm điểm chuẩn của một khối để tuyển đủ
+một chỉ tiêu cho trước, có thể cộng điểm ưu tiên theo tỉnh hoặc theo nhóm
+tỉnh (khu vực). Phép tính dùng mảng đếm thí sinh theo (tỉnh, ô lưới tổng điểm)
+của RankingModel nên mỗi kịch bản chỉ tốn O(kích thước lưới) thay vì sắp xếp
+tổng điểm của cả triệu thí sinh.
+"""
+
+import numpy as np
+
+from models.score_grid import BLOCKS, GRID_STEP, PROVINCE_COUNT, grid_to_score
+
+
+class AdmissionModel:
+    """Lớp mô phỏng điểm chuẩn xét tuyển"""
+
+    def __init__(self, ranking):
+        """Khởi tạo model mô phỏng
+
+        Args:
+            ranking: RankingModel đang được DataModel cập nhật
+        """
+        self.ranking = ranking
+
+    def _expand_bonuses(self, bonuses, regions=None):
+        """Chuyển điểm ưu tiên thành số ô lưới cộng thêm cho từng tỉnh
+
+        Args:
+            bonuses: Từ điển mã tỉnh hoặc tên khu vực -> điểm ưu tiên
+            regions: Từ điển tên khu vực -> danh sách mã tỉnh
+
+        Returns:
+            ndarray: Số ô lưới cộng thêm cho từng mã tỉnh (có thể âm); tỉnh có
+            mặt ở nhiều mục (riêng lẻ và trong khu vực) được cộng dồn điểm ưu tiên
+
+        Raises:
+            ValueError: Nếu điểm ưu tiên, mã tỉnh hoặc tên khu vực không hợp lệ
+        """
+        totals = np.zeros(PROVINCE_COUNT, dtype=float)
+        for key, bonus in (bonuses or {}).items():
+            try:
+                bonus = float(bonus)
+            except (TypeError, ValueError):
+                raise ValueError(f"Điểm ưu tiên không hợp lệ: {bonus}")
+            if not np.isfinite(bonus):
+                raise ValueError(f"Điểm ưu tiên không hợp lệ: {bonus}")
+
+            provinces = regions[key] if regions and key in regions else [key]
+            for province in provinces:
+                try:
+                    code = int(province)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Không tìm thấy khu vực hoặc mã tỉnh: {province}")
+                if not 0 < code < PROVINCE_COUNT:
+                    raise ValueError(f"Mã tỉnh không hợp lệ: {province}")
+                totals[code] += bonus
+        return np.rint(totals / GRID_STEP).astype(np.int64)
+
+    def _check_quota(self, quota):
+        """Kiểm tra chỉ tiêu là số nguyên dương
+
+        Raises:
+            ValueError: Nếu chỉ tiêu không hợp lệ
+        """
+        try:
+            value = float(quota)
+        except (TypeError, ValueError):
+            raise ValueError(f"Chỉ tiêu không hợp lệ: {quota}")
+        if not value.is_integer() or value <= 0:
+            raise ValueError(f"Chỉ tiêu phải là số nguyên dương: {quota}")
+        return int(value)
+
+    def _histogram(self, block, shifts):
+        """Tính phân phối tổng điểm khối sau khi cộng điểm ưu tiên
+
+        Returns:
+            tuple: (phân phối, offset) với ô k của phân phối ứng với tổng điểm
+            (k - offset) * GRID_STEP; offset > 0 khi có điểm ưu tiên âm
+        """
+        counts = self.ranking.get_counts(block)
+        size = counts.shape[1]
+        offset = max(-int(shifts.min()), 0)
+        hist = np.zeros(offset + size + max(int(shifts.max()), 0), dtype=np.int64)
+        # Gộp các tỉnh có cùng mức ưu tiên rồi dịch phân phối theo mức đó
+        for shift in np.unique(shifts):
+            start = offset + int(shift)
+            hist[start:start + size] += counts[shifts == shift].sum(axis=0)
+        return hist, offset
+
+    def _cutoff(self, hist, offset, quota):
+        """Tìm điểm chuẩn từ phân phối tổng điểm
+
+        Điểm chuẩn là mức thấp nhất mà số thí sinh đạt từ mức đó trở lên không
+        vượt quá chỉ tiêu.
+        """
+        # admitted[k] = số thí sinh có tổng điểm >= ô k
+        admitted = np.cumsum(hist[::-1])[::-1]
+        total = int(admitted[0])
+        if total == 0:
+            return None
+
+        if quota >= total:
+            index = int(np.flatnonzero(hist)[0])
+        else:
+            index = int(np.argmax(admitted <= quota))
+            if admitted[index] == 0:
+                # Số thí sinh ở mức cao nhất đã vượt chỉ tiêu
+                index = int(np.flatnonzero(hist)[-1]) + 1
+        next_index = index - 1 if index > 0 else None
+        return {
+            'cutoff': grid_to_score(index - offset),
+            'admitted': int(admitted[index]) if index < len(admitted) else 0,
+            'quota': quota,
+            'total': total,
+            # Số thí sinh bằng điểm ở mức ngay dưới điểm chuẩn (bị loại vì vượt chỉ tiêu)
+            'tied_below': int(hist[next_index]) if next_index is not None else 0,
+        }
+
+    def simulate(self, block, quota, bonuses=None, regions=None):
+        """Tìm điểm chuẩn của một khối với chỉ tiêu và điểm ưu tiên cho trước
+
+        Returns:
+            dict: 'cutoff', 'admitted', 'quota', 'total', 'tied_below';
+            None nếu khối không hợp lệ hoặc chưa có dữ liệu
+
+        Raises:
+            ValueError: Nếu chỉ tiêu hoặc điểm ưu tiên không hợp lệ
+        """
+        if block not in BLOCKS or not self.ranking.has_data():
+            return None
+
+        quota = self._check_quota(quota)
+        hist, offset = self._histogram(block, self._expand_bonuses(bonuses, regions))
+        return self._cutoff(hist, offset, quota)
+
+    def sweep_quotas(self, block, quotas, bonuses=None, regions=None):
+        """Tính đường điểm chuẩn theo nhiều mức chỉ tiêu
+
+        Returns:
+            list: Kết quả simulate cho từng chỉ tiêu
+        """
+        if block not in BLOCKS or not self.ranking.has_data():
+            return None
+
+        quotas = [self._check_quota(quota) for quota in quotas]
+        hist, offset = self._histogram(block, self._expand_bonuses(bonuses, regions))
+        return [self._cutoff(hist, offset, quota) for quota in quotas]
+
+    def sweep_bonus(self, block, quota, target, bonus_values, bonuses=None, regions=None):
+        """Tính đường điểm chuẩn khi thay đổi điểm ưu tiên của một tỉnh/khu vực
+
+        Args:
+            target: Mã tỉnh hoặc tên khu vực được thay đổi điểm ưu tiên
+            bonus_values: Các mức điểm ưu tiên cần thử
+
+        Returns:
+            list: Kết quả simulate cho từng mức điểm ưu tiên
+        """
+        if block not in BLOCKS or not self.ranking.has_data():
+            return None
+
+        quota = self._check_quota(quota)
+        results = []
+        for bonus in bonus_values:
+            scenario = dict(bonuses or {})
+            scenario[target] = bonus
+            hist, offset = self._histogram(block, self._expand_bonuses(scenario, regions))
+            result = self._cutoff(hist, offset, quota)
+            if result is not None:
+                result['bonus'] = bonus
+            results.append(result)
+        return results
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module phân tích tương quan giữa các môn học
+
+Module này chứa lớp CorrelationModel tính ma trận hiệp phương sai, hệ số
+tương quan (chỉ dùng các thí sinh có điểm cả hai môn), phân phối đồng thời
+trên lưới điểm và điểm trung bình có điều kiện giữa các cặp môn. Ma trận điểm
+được duyệt theo từng khối dòng bằng phép nhân ma trận nên không tạo bản sao
+dữ liệu cho từng cặp môn.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from models.score_grid import GRID_STEP, SUBJECT_GRID_SIZE, to_grid_index
+
+
+class CorrelationModel:
+    """Lớp phân tích tương quan giữa các môn học"""
+
+    def __init__(self, subjects_dict, block_size=200_000):
+        """Khởi tạo model tương quan
+
+        Args:
+            subjects_dict: Từ điển mã môn -> tên môn của DataModel
+            block_size: Số dòng xử lý trong mỗi khối
+        """
+        self.subjects_dict = subjects_dict
+        self.block_size = block_size
+        self._version = None
+        self._cache = {}
+
+    def _check_version(self, version):
+        """Xóa kết quả đã lưu nếu dữ liệu đã thay đổi"""
+        if version != self._version:
+            self._version = version
+            self._cache = {}
+
+    def _columns(self, df):
+        """Lấy mảng điểm của từng môn (không sao chép nếu đã là float64)"""
+        return [pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+                for col in self.subjects_dict]
+
+    def get_matrices(self, df, version):
+        """Tính ma trận số lượng, hiệp phương sai và tương quan giữa các môn
+
+        Mỗi cặp môn chỉ dùng các thí sinh có điểm cả hai môn.
+
+        Returns:
+            dict: 'count', 'mean', 'covariance', 'correlation' dạng DataFrame
+            với chỉ số là tên môn; None nếu chưa có dữ liệu
+        """
+        if df is None:
+            return None
+
+        self._check_version(version)
+        if 'matrices' in self._cache:
+            return self._cache['matrices']
+
+        columns = self._columns(df)
+        k = len(columns)
+        count = np.zeros((k, k))
+        # sums[i, j] = tổng điểm môn i trên các thí sinh có điểm môn j
+        sums = np.zeros((k, k))
+        squares = np.zeros((k, k))
+        products = np.zeros((k, k))
+
+        for start in range(0, len(df), self.block_size):
+            block = np.column_stack([col[start:start + self.block_size] for col in columns])
+            present = np.isfinite(block)
+            values = np.where(present, block, 0.0)
+            mask = present.astype(float)
+            count += mask.T @ mask
+            sums += values.T @ mask
+            squares += (values * values).T @ mask
+            products += values.T @ values
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = sums / count
+            covariance = (products - sums * sums.T / count) / (count - 1)
+            var_i = (squares - sums * sums / count) / (count - 1)
+            correlation = covariance / np.sqrt(var_i * var_i.T)
+        covariance[count < 2] = np.nan
+        correlation[count < 2] = np.nan
+
+        names = list(self.subjects_dict.values())
+        result = {
+            'count': pd.DataFrame(count.astype(np.int64), index=names, columns=names),
+            'mean': pd.DataFrame(mean, index=names, columns=names),
+            'covariance': pd.DataFrame(covariance, index=names, columns=names),
+            'correlation': pd.DataFrame(np.clip(correlation, -1, 1), index=names, columns=names),
+        }
+        self._cache['matrices'] = result
+        return result
+
+    def _grid_columns(self, df):
+        """Lấy chỉ số lưới của từng môn
+
+        Ô trống được đưa vào ô phụ SUBJECT_GRID_SIZE ở cuối lưới để các phép
+        đếm không phải lọc dữ liệu cho từng cặp môn.
+        """
+        if 'grid' not in self._cache:
+            grid = {}
+            for col, values in zip(self.subjects_dict, self._columns(df)):
+                idx = to_grid_index(values)
+                idx[idx < 0] = SUBJECT_GRID_SIZE
+                grid[col] = idx
+            self._cache['grid'] = grid
+        return self._cache['grid']
+
+    def get_joint_histograms(self, df, version):
+        """Tính phân phối đồng thời trên lưới điểm cho tất cả các cặp môn
+
+        Returns:
+            dict: (mã môn x, mã môn y) -> ndarray kích thước lưới x lưới,
+            phần tử [a, b] là số thí sinh có điểm x = a * GRID_STEP và
+            điểm y = b * GRID_STEP
+        """
+        if df is None:
+            return None
+
+        self._check_version(version)
+        if 'joint' in self._cache:
+            return self._cache['joint']
+
+        size = SUBJECT_GRID_SIZE + 1
+        grid = self._grid_columns(df)
+        joint = {}
+        for x, y in itertools.combinations(self.subjects_dict, 2):
+            flat = grid[x] * size + grid[y]
+            hist = np.bincount(flat, minlength=size * size).reshape(size, size)
+            joint[(x, y)] = hist[:-1, :-1]
+
+        self._cache['joint'] = joint
+        return joint
+
+    def get_joint_histogram(self, df, version, x, y):
+        """Lấy phân phối đồng thời của một cặp môn (theo mã môn)"""
+        joint = self.get_joint_histograms(df, version)
+        if joint is None or x == y:
+            return None
+        if (x, y) in joint:
+            return joint[(x, y)]
+        return joint[(y, x)].T
+
+    def get_conditional_means(self, df, version, x, y):
+        """Tính điểm trung bình môn y theo từng mức điểm môn x
+
+        Returns:
+            DataFrame: Các cột 'score', 'count', 'mean' cho các mức điểm môn x
+            có ít nhất một thí sinh dự thi cả hai môn
+        """
+        hist = self.get_joint_histogram(df, version, x, y)
+        if hist is None:
+            return None
+
+        scores = np.arange(SUBJECT_GRID_SIZE) * GRID_STEP
+        counts = hist.sum(axis=1)
+        present = counts > 0
+        means = (hist @ scores)[present] / counts[present]
+        return pd.DataFrame({
+            'score': np.round(scores[present], 2),
+            'count': counts[present],
+            'mean': means,
+        })
@@ -12,6 +12,17 @@ import os
 import pandas as pd
 import numpy as np
 
+from models.admission_model import AdmissionModel
+from models.correlation_model import CorrelationModel
+from models.history_model import DataSnapshot, HistoryModel
+from models.quality_model import QualityModel
+from models.ranking_model import RankingModel
+from models.streaming_model import StreamingModel
+
+# Các cột có ít giá trị khác nhau, lưu dạng mã nguyên (pandas Categorical)
+# thay vì chuỗi Python để tiết kiệm bộ nhớ và lọc/nhóm trên mã số
+CATEGORICAL_COLUMNS = ['ma_ngoai_ngu']
+
 class DataModel:
     """Lớp xử lý dữ liệu điểm thi THPT"""
     
@@ -33,16 +44,62 @@ class DataModel:
         }
         self.current_page = 0
         self.rows_per_page = 20
+        self.ranking = RankingModel(self.subjects_dict)
+        self.admission = AdmissionModel(self.ranking)
+        self.correlation = CorrelationModel(self.subjects_dict)
+        self.quality = QualityModel(self.subjects_dict)
+        self.quality_report = None
+        # Tăng mỗi khi dữ liệu thay đổi để làm mới các kết quả đã lưu
+        self.data_version = 0
+        self.history = HistoryModel()
+        # True nếu self.df đang được một snapshot tham chiếu
+        self._snapshot_shared = False
+        # Chế độ xử lý theo luồng cho file lớn hơn bộ nhớ
+        self.streaming = None
         
     def load_data(self):
         """Đọc dữ liệu từ file CSV"""
         try:
+            self.streaming = None
             self.df = pd.read_csv(self.file_path)
+            # Kiểm tra chất lượng trước khi các giá trị lỗi bị chuyển thành NaN
+            self.quality_report = self.quality.scan(self.df)
             self.process_data()
+            self.ranking.build(self.df)
+            self.history.clear()
+            self._snapshot_shared = False
+            self.data_version += 1
+            return True, ""
+        except Exception as e:
+            return False, str(e)
+    
+    def load_streaming(self, memory_budget_mb=256):
+        """Mở file CSV ở chế độ xử lý theo luồng (không tải toàn bộ vào bộ nhớ)
+        
+        Ở chế độ này các thống kê tổng quan, phân tích môn học và tìm kiếm theo
+        SBD được tính theo từng khối dữ liệu, không hỗ trợ chỉnh sửa.
+        """
+        try:
+            self.df = None
+            self.streaming = StreamingModel(self.file_path, self.subjects_dict, memory_budget_mb)
+            self.ranking.build(None)
+            self.history.clear()
+            self.data_version += 1
             return True, ""
         except Exception as e:
             return False, str(e)
     
+    def export_filtered(self, output_path, column, value, condition='equal'):
+        """Lọc dữ liệu ở chế độ xử lý theo luồng và ghi ra file CSV"""
+        if self.streaming is None:
+            return False, "Chưa mở dữ liệu ở chế độ xử lý theo luồng"
+        
+        try:
+            count = self.streaming.export_filtered(output_path, column, value, condition)
+            return True, f"Đã xuất {count} thí sinh"
+        except Exception as e:
+            return False, str(e)
+    
     def process_data(self):
         """Xử lý dữ liệu sau khi đọc"""
         if self.df is not None:
@@ -51,6 +108,47 @@ class DataModel:
                               'hoa_hoc', 'sinh_hoc', 'lich_su', 'dia_li', 'gdcd']
             for col in numeric_columns:
                 self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
+            
+            # Mã hóa các cột phân loại thành mã nguyên
+            for col in CATEGORICAL_COLUMNS:
+                if col in self.df.columns:
+                    self.df[col] = self.df[col].astype('category')
+    
+    def import_data(self, file_path):
+        """Nhập thêm thí sinh từ file CSV
+        
+        Dữ liệu nhập được kiểm tra chất lượng trước khi thêm, các thí sinh có
+        SBD đã tồn tại sẽ bị bỏ qua.
+        """
+        # Báo cáo cũ không còn đúng với file đang nhập
+        self.quality_report = None
+        if self.df is None:
+            return False, "Chưa tải dữ liệu"
+        
+        try:
+            new_data = pd.read_csv(file_path)
+            self.quality_report = self.quality.scan(new_data, existing_sbd=self.df['sbd'])
+            for col in self.subjects_dict:
+                new_data[col] = pd.to_numeric(new_data[col], errors='coerce')
+            
+            new_data = new_data[~new_data['sbd'].isin(self.df['sbd'])]
+            new_data = new_data.drop_duplicates(subset='sbd')
+            if len(new_data) == 0:
+                return False, "Không có thí sinh mới"
+            
+            self._append_rows(new_data)
+            self.history.record({'type': 'add', 'rows': new_data})
+            return True, f"Đã nhập {len(new_data)} thí sinh"
+        except Exception as e:
+            return False, str(e)
+    
+    def get_quality_report(self):
+        """Lấy báo cáo chất lượng dữ liệu của lần tải/nhập gần nhất"""
+        return self.quality_report
+    
+    def get_quality_summary(self):
+        """Lấy tóm tắt báo cáo chất lượng dữ liệu dạng các dòng văn bản"""
+        return self.quality.summarize(self.quality_report)
     
     def get_subject_names(self):
         """Lấy danh sách tên các môn học"""
@@ -65,6 +163,8 @@ class DataModel:
     
     def get_overview_stats(self):
         """Lấy thống kê tổng quan về dữ liệu"""
+        if self.streaming is not None:
+            return self.streaming.get_overview_stats()
         if self.df is None:
             return None
         
@@ -94,6 +194,11 @@ class DataModel:
     
     def search_by_sbd(self, sbd):
         """Tìm kiếm thí sinh theo SBD"""
+        if self.streaming is not None and sbd:
+            try:
+                return self.streaming.search_by_sbd(sbd)
+            except Exception:
+                return None
         if self.df is None or not sbd:
             return None
         
@@ -102,14 +207,22 @@ class DataModel:
             return result.iloc[0]
         return None
     
-    def analyze_subject(self, subject_name):
-        """Phân tích thống kê cho một môn học"""
-        if self.df is None:
+    def get_student_rank(self, student):
+        """Lấy thứ hạng toàn quốc/tỉnh của thí sinh theo từng môn và khối"""
+        if self.df is None or student is None:
             return None
         
+        return self.ranking.get_rank(student)
+    
+    def analyze_subject(self, subject_name):
+        """Phân tích thống kê cho một môn học"""
         subject_col = self.get_subject_code(subject_name)
         if not subject_col:
             return None
+        if self.streaming is not None:
+            return self.streaming.analyze_subject(subject_col)
+        if self.df is None:
+            return None
         
         data = self.df[subject_col].dropna()
         
@@ -137,6 +250,86 @@ class DataModel:
         
         return stats
     
+    def get_correlation_matrix(self):
+        """Lấy ma trận tương quan và hiệp phương sai giữa các môn học"""
+        if self.df is None:
+            return None
+        
+        return self.correlation.get_matrices(self.df, self.data_version)
+    
+    def get_joint_distribution(self, subject_x, subject_y):
+        """Lấy phân phối điểm đồng thời của hai môn học trên lưới điểm"""
+        if self.df is None:
+            return None
+        
+        col_x = self.get_subject_code(subject_x)
+        col_y = self.get_subject_code(subject_y)
+        if not col_x or not col_y:
+            return None
+        
+        return self.correlation.get_joint_histogram(self.df, self.data_version, col_x, col_y)
+    
+    def get_conditional_means(self, subject_x, subject_y):
+        """Lấy điểm trung bình môn y theo từng mức điểm môn x"""
+        if self.df is None:
+            return None
+        
+        col_x = self.get_subject_code(subject_x)
+        col_y = self.get_subject_code(subject_y)
+        if not col_x or not col_y:
+            return None
+        
+        return self.correlation.get_conditional_means(self.df, self.data_version, col_x, col_y)
+    
+    def simulate_cutoff(self, block, quota, bonuses=None, regions=None):
+        """Mô phỏng điểm chuẩn của một khối với chỉ tiêu cho trước
+        
+        Args:
+            block: Mã khối (A00, A01, B00, C00, D01)
+            quota: Chỉ tiêu tuyển sinh
+            bonuses: Từ điển mã tỉnh hoặc tên khu vực -> điểm ưu tiên
+            regions: Từ điển tên khu vực -> danh sách mã tỉnh
+        
+        Returns:
+            tuple: (True, kết quả) hoặc (False, thông báo lỗi)
+        """
+        if self.df is None:
+            return False, "Chưa tải dữ liệu"
+        
+        try:
+            result = self.admission.simulate(block, quota, bonuses, regions)
+            if result is None:
+                return False, "Khối không hợp lệ hoặc không có thí sinh"
+            return True, result
+        except Exception as e:
+            return False, str(e)
+    
+    def get_cutoff_curve(self, block, quotas, bonuses=None, regions=None):
+        """Lấy đường điểm chuẩn theo nhiều mức chỉ tiêu"""
+        if self.df is None:
+            return False, "Chưa tải dữ liệu"
+        
+        try:
+            results = self.admission.sweep_quotas(block, quotas, bonuses, regions)
+            if results is None:
+                return False, "Khối không hợp lệ"
+            return True, results
+        except Exception as e:
+            return False, str(e)
+    
+    def get_bonus_curve(self, block, quota, target, bonus_values, bonuses=None, regions=None):
+        """Lấy đường điểm chuẩn khi thay đổi điểm ưu tiên của một tỉnh/khu vực"""
+        if self.df is None:
+            return False, "Chưa tải dữ liệu"
+        
+        try:
+            results = self.admission.sweep_bonus(block, quota, target, bonus_values, bonuses, regions)
+            if results is None:
+                return False, "Khối không hợp lệ"
+            return True, results
+        except Exception as e:
+            return False, str(e)
+    
     def get_chart_data(self, subject_name):
         """Lấy dữ liệu để vẽ biểu đồ"""
         if self.df is None:
@@ -207,7 +400,9 @@ class DataModel:
                 return False, "SBD đã tồn tại"
             
             # Thêm thí sinh mới
-            self.df = pd.concat([self.df, pd.DataFrame([student_data])], ignore_index=True)
+            rows = pd.DataFrame([student_data])
+            self._append_rows(rows)
+            self.history.record({'type': 'add', 'rows': rows})
             return True, ""
         except Exception as e:
             return False, str(e)
@@ -219,14 +414,18 @@ class DataModel:
         
         try:
             # Tìm thí sinh theo SBD
-            idx = self.df[self.df['sbd'] == sbd].index
-            if len(idx) == 0:
+            positions = np.flatnonzero((self.df['sbd'] == sbd).to_numpy())
+            if len(positions) == 0:
                 return False, "Không tìm thấy thí sinh"
             
-            # Cập nhật thông tin
-            for key, value in student_data.items():
-                if key in self.df.columns:
-                    self.df.loc[idx[0], key] = value
+            # Cập nhật thông tin, lưu lại giá trị cũ của các cột bị sửa
+            position = int(positions[0])
+            new_values = {key: value for key, value in student_data.items() if key in self.df.columns}
+            old_values = {key: self.df[key].iat[position] for key in new_values}
+            # Chỉ ghi lịch sử khi đã cập nhật trọn vẹn, lưu giá trị sau khi chuyển kiểu
+            new_values = self._set_values(position, new_values)
+            self.history.record({'type': 'update', 'position': position,
+                                 'old': old_values, 'new': new_values})
             
             return True, ""
         except Exception as e:
@@ -239,13 +438,12 @@ class DataModel:
         
         try:
             # Tìm thí sinh theo SBD
-            idx = self.df[self.df['sbd'] == sbd].index
-            if len(idx) == 0:
+            positions = np.flatnonzero((self.df['sbd'] == sbd).to_numpy())
+            if len(positions) == 0:
                 return False, "Không tìm thấy thí sinh"
             
             # Xóa thí sinh
-            self.df = self.df.drop(idx[0])
-            self.df = self.df.reset_index(drop=True)
+            self._delete_positions(positions[:1])
             
             return True, ""
         except Exception as e:
@@ -258,15 +456,14 @@ class DataModel:
         
         try:
             # Tìm các thí sinh theo SBD
-            idx = self.df[self.df['sbd'].isin(sbd_list)].index
-            if len(idx) == 0:
+            positions = np.flatnonzero(self.df['sbd'].isin(sbd_list).to_numpy())
+            if len(positions) == 0:
                 return False, "Không tìm thấy thí sinh"
             
             # Xóa các thí sinh
-            self.df = self.df.drop(idx)
-            self.df = self.df.reset_index(drop=True)
+            self._delete_positions(positions)
             
-            return True, f"Đã xóa {len(idx)} thí sinh"
+            return True, f"Đã xóa {len(positions)} thí sinh"
         except Exception as e:
             return False, str(e)
     
@@ -276,26 +473,242 @@ class DataModel:
             return False
         
         try:
-            self.df = self.df.sort_values(by=column, ascending=ascending)
+            # Lưu thứ tự dòng để có thể hoàn tác
+            order = self.df.reset_index(drop=True)[column].sort_values(ascending=ascending).index.to_numpy()
+            self._reorder(order)
+            self.history.record({'type': 'sort', 'order': order})
             self.current_page = 0  # Reset về trang đầu tiên
             return True
         except Exception:
             return False
     
+    # Các thao tác chỉnh sửa cơ bản, dùng chung cho chỉnh sửa và hoàn tác/làm lại.
+    # Các bản ghi lịch sử dùng vị trí dòng nên luôn khớp với dữ liệu khi được
+    # hoàn tác/làm lại theo đúng thứ tự.
+    
+    def _normalize_values(self, values):
+        """Chuyển giá trị nhập về kiểu của cột trước khi ghi
+        
+        Ô điểm để trống được chuyển thành NaN. Giá trị không hợp lệ báo lỗi
+        ngay tại đây để không có ô nào bị ghi dở.
+        """
+        normalized = {}
+        for key, value in values.items():
+            dtype = self.df[key].dtype
+            if isinstance(value, str) and not value.strip():
+                value = None
+            try:
+                if key in self.subjects_dict or pd.api.types.is_float_dtype(dtype):
+                    value = np.nan if value is None else float(value)
+                elif pd.api.types.is_integer_dtype(dtype) and value is not None:
+                    value = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Giá trị không hợp lệ cho cột {key}: {value}")
+            normalized[key] = np.nan if value is None else value
+        return normalized
+    
+    def _set_values(self, position, values):
+        """Gán giá trị các cột của một dòng
+        
+        Thao tác được thực hiện trọn vẹn hoặc không thay đổi gì: nếu ghi lỗi,
+        các ô đã ghi được trả lại giá trị cũ và bảng xếp hạng được khôi phục.
+        
+        Returns:
+            dict: Các giá trị đã ghi (sau khi chuyển kiểu)
+        """
+        values = self._normalize_values(values)
+        
+        if self._snapshot_shared:
+            # Copy-on-write: chỉ sao chép các cột bị sửa, snapshot giữ nguyên dữ liệu cũ
+            self.df = self.df.copy(deep=False)
+            for key in values:
+                self.df[key] = self.df[key].copy()
+            self._snapshot_shared = False
+        
+        # Thêm giá trị mới vào danh sách mã của các cột phân loại
+        for key, value in values.items():
+            column = self.df[key]
+            if (isinstance(column.dtype, pd.CategoricalDtype) and not pd.isna(value)
+                    and value not in column.cat.categories):
+                self._add_categories(key, [value])
+        
+        label = self.df.index[position]
+        old_values = {key: self.df[key].iat[position] for key in values}
+        self.ranking.remove_rows(self.df.iloc[[position]])
+        try:
+            for key, value in values.items():
+                self.df.loc[label, key] = value
+        except Exception:
+            for key, value in old_values.items():
+                self.df.loc[label, key] = value
+            self.ranking.add_rows(self.df.iloc[[position]])
+            raise
+        self.ranking.add_rows(self.df.iloc[[position]])
+        self.data_version += 1
+        return values
+    
+    def _append_rows(self, rows):
+        """Thêm các dòng vào cuối dữ liệu"""
+        rows = self._align_categories(rows)
+        self.df = pd.concat([self.df, rows], ignore_index=True)
+        self.ranking.add_rows(self.df.iloc[-len(rows):])
+        self._snapshot_shared = False
+        self.data_version += 1
+    
+    def _align_categories(self, rows):
+        """Đưa các cột phân loại của các dòng mới về cùng bộ mã với dữ liệu
+        
+        pd.concat chỉ giữ kiểu category khi hai bên có cùng danh sách mã, nếu
+        không cột sẽ bị chuyển lại thành chuỗi.
+        """
+        rows = rows.copy()
+        for col in self.df.columns:
+            dtype = self.df[col].dtype
+            if not isinstance(dtype, pd.CategoricalDtype):
+                continue
+            if col not in rows.columns:
+                rows[col] = np.nan
+            new_values = pd.Index(rows[col].dropna().unique()).difference(dtype.categories)
+            if len(new_values) > 0:
+                if self._snapshot_shared:
+                    # Copy-on-write: không sửa danh sách mã trên frame snapshot đang dùng
+                    self.df = self.df.copy(deep=False)
+                    self._snapshot_shared = False
+                self._add_categories(col, new_values)
+            rows[col] = rows[col].astype(self.df[col].dtype)
+        return rows
+    
+    def _add_categories(self, column, new_values):
+        """Thêm giá trị vào danh sách mã của cột phân loại
+        
+        Danh sách mã luôn được giữ theo thứ tự tăng dần để sắp xếp theo cột cho
+        cùng thứ tự như khi cột là chuỗi.
+        """
+        categories = self.df[column].cat.categories.union(pd.Index(new_values))
+        self.df[column] = self.df[column].cat.set_categories(categories.sort_values())
+    
+    def get_category_counts(self, column):
+        """Đếm số thí sinh theo từng giá trị của một cột phân loại
+        
+        Với cột đã mã hóa, phép đếm chạy trực tiếp trên mã nguyên.
+        """
+        if self.df is None or column not in self.df.columns:
+            return None
+        
+        data = self.df[column]
+        if not isinstance(data.dtype, pd.CategoricalDtype):
+            return data.value_counts()
+        
+        codes = data.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(data.cat.categories))
+        return pd.Series(counts, index=data.cat.categories, name='count')
+    
+    def _delete_positions(self, positions, record=True):
+        """Xóa các dòng theo vị trí"""
+        rows = self.df.iloc[positions]
+        self.ranking.remove_rows(rows)
+        self.df = self.df.drop(self.df.index[positions])
+        self.df = self.df.reset_index(drop=True)
+        self._snapshot_shared = False
+        self.data_version += 1
+        if record:
+            self.history.record({'type': 'delete', 'positions': positions, 'rows': rows})
+    
+    def _insert_rows(self, positions, rows):
+        """Chèn lại các dòng đã xóa vào đúng vị trí cũ"""
+        total = len(self.df) + len(rows)
+        order = np.empty(total, dtype=np.int64)
+        kept = np.ones(total, dtype=bool)
+        kept[positions] = False
+        order[kept] = np.arange(len(self.df))
+        order[positions] = len(self.df) + np.arange(len(rows))
+        rows = self._align_categories(rows)
+        self.df = pd.concat([self.df, rows], ignore_index=True).iloc[order].reset_index(drop=True)
+        self.ranking.add_rows(rows)
+        self._snapshot_shared = False
+        self.data_version += 1
+    
+    def _reorder(self, order):
+        """Sắp xếp lại các dòng theo thứ tự vị trí cho trước"""
+        self.df = self.df.iloc[order]
+        self._snapshot_shared = False
+    
+    def undo(self):
+        """Hoàn tác chỉnh sửa gần nhất"""
+        if self.df is None:
+            return False, "Chưa tải dữ liệu"
+        
+        edit = self.history.pop_undo()
+        if edit is None:
+            return False, "Không có thao tác để hoàn tác"
+        
+        if edit['type'] == 'update':
+            self._set_values(edit['position'], edit['old'])
+        elif edit['type'] == 'add':
+            self._delete_positions(np.arange(len(self.df) - len(edit['rows']), len(self.df)), record=False)
+        elif edit['type'] == 'delete':
+            self._insert_rows(edit['positions'], edit['rows'])
+        elif edit['type'] == 'sort':
+            self._reorder(np.argsort(edit['order']))
+        return True, ""
+    
+    def redo(self):
+        """Làm lại chỉnh sửa vừa hoàn tác"""
+        if self.df is None:
+            return False, "Chưa tải dữ liệu"
+        
+        edit = self.history.pop_redo()
+        if edit is None:
+            return False, "Không có thao tác để làm lại"
+        
+        if edit['type'] == 'update':
+            self._set_values(edit['position'], edit['new'])
+        elif edit['type'] == 'add':
+            self._append_rows(edit['rows'])
+        elif edit['type'] == 'delete':
+            self._delete_positions(edit['positions'], record=False)
+        elif edit['type'] == 'sort':
+            self._reorder(edit['order'])
+        return True, ""
+    
+    def get_snapshot(self):
+        """Lấy phiên bản chỉ đọc của dữ liệu hiện tại
+        
+        Snapshot không bị ảnh hưởng bởi các chỉnh sửa sau đó, cho phép chạy
+        các phân tích trên một phiên bản ổn định trong khi vẫn tiếp tục sửa.
+        """
+        if self.df is None:
+            return None
+        
+        self._snapshot_shared = True
+        return DataSnapshot(self.df, self.data_version)
+    
     def filter_data(self, column, value, condition='equal'):
         """Lọc dữ liệu theo điều kiện"""
         if self.df is None or column not in self.df.columns:
             return None
         
         try:
+            data = self.df[column]
+            categorical = isinstance(data.dtype, pd.CategoricalDtype)
             if condition == 'equal':
-                filtered = self.df[self.df[column] == value]
+                filtered = self.df[data == value]
+            elif condition in ('greater', 'less') and categorical:
+                # So sánh trên danh sách mã dạng chuỗi rồi lọc theo mã nguyên
+                categories = data.cat.categories.astype(str)
+                matched = categories > value if condition == 'greater' else categories < value
+                filtered = self.df[np.isin(data.cat.codes.to_numpy(), np.flatnonzero(matched))]
             elif condition == 'greater':
-                filtered = self.df[self.df[column] > value]
+                filtered = self.df[data > value]
             elif condition == 'less':
-                filtered = self.df[self.df[column] < value]
+                filtered = self.df[data < value]
             elif condition == 'contains':
-                filtered = self.df[self.df[column].astype(str).str.contains(str(value), na=False)]
+                if categorical:
+                    # Chỉ so khớp trên danh sách mã rồi lọc theo mã nguyên
+                    matched = np.flatnonzero(data.cat.categories.astype(str).str.contains(str(value)))
+                    filtered = self.df[np.isin(data.cat.codes.to_numpy(), matched)]
+                else:
+                    filtered = self.df[data.astype(str).str.contains(str(value), na=False)]
             else:
                 return None
             
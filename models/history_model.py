@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module lịch sử chỉnh sửa dữ liệu
+
+Module này chứa lớp HistoryModel lưu các thay đổi dưới dạng bản ghi chênh
+lệch (chỉ các ô/dòng bị sửa, thêm hoặc xóa) để hỗ trợ hoàn tác và làm lại
+nhiều bước mà không phải giữ bản sao toàn bộ dữ liệu, cùng lớp DataSnapshot
+đại diện cho một phiên bản chỉ đọc của dữ liệu.
+"""
+
+
+class DataSnapshot:
+    """Phiên bản chỉ đọc của dữ liệu tại một thời điểm"""
+
+    def __init__(self, df, version):
+        """Khởi tạo snapshot
+
+        Args:
+            df: DataFrame tại thời điểm tạo snapshot, không được sửa trực tiếp
+            version: Phiên bản dữ liệu tương ứng (DataModel.data_version)
+        """
+        self.df = df
+        self.version = version
+
+
+class HistoryModel:
+    """Lớp quản lý hoàn tác/làm lại các chỉnh sửa
+
+    Mỗi bản ghi là một dict có khóa 'type':
+        - 'update': 'position', 'old', 'new' (vị trí dòng, giá trị cũ/mới của các cột bị sửa)
+        - 'add': 'rows' (các dòng được thêm vào cuối dữ liệu)
+        - 'delete': 'positions', 'rows' (vị trí và nội dung các dòng bị xóa)
+        - 'sort': 'order' (vị trí cũ của từng dòng sau khi sắp xếp)
+    """
+
+    def __init__(self, max_levels=100):
+        """Khởi tạo lịch sử
+
+        Args:
+            max_levels: Số bước hoàn tác tối đa được lưu
+        """
+        self.max_levels = max_levels
+        self._undo_stack = []
+        self._redo_stack = []
+
+    def clear(self):
+        """Xóa toàn bộ lịch sử (khi tải dữ liệu mới)"""
+        self._undo_stack = []
+        self._redo_stack = []
+
+    def record(self, edit):
+        """Ghi lại một chỉnh sửa mới, xóa các bước làm lại"""
+        self._undo_stack.append(edit)
+        if len(self._undo_stack) > self.max_levels:
+            self._undo_stack.pop(0)
+        self._redo_stack = []
+
+    def can_undo(self):
+        """Kiểm tra còn bước hoàn tác không"""
+        return len(self._undo_stack) > 0
+
+    def can_redo(self):
+        """Kiểm tra còn bước làm lại không"""
+        return len(self._redo_stack) > 0
+
+    def pop_undo(self):
+        """Lấy chỉnh sửa cần hoàn tác và chuyển sang danh sách làm lại"""
+        if not self._undo_stack:
+            return None
+        edit = self._undo_stack.pop()
+        self._redo_stack.append(edit)
+        return edit
+
+    def pop_redo(self):
+        """Lấy chỉnh sửa cần làm lại và chuyển về danh sách hoàn tác"""
+        if not self._redo_stack:
+            return None
+        edit = self._redo_stack.pop()
+        self._undo_stack.append(edit)
+        return edit
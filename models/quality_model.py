@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module kiểm tra chất lượng dữ liệu điểm thi THPT
+
+Module này chứa lớp QualityModel quét toàn bộ dữ liệu một lần bằng các phép
+toán vector để phát hiện điểm không phải số, điểm ngoài khoảng 0-10, điểm
+không nằm trên lưới điểm của môn, SBD trùng lặp, SBD sai định dạng hoặc sai
+mã tỉnh, thí sinh dự thi cả hai tổ hợp KHTN và KHXH, và các tỉnh có tỉ lệ điểm
+cao bất thường so với các tỉnh khác.
+"""
+
+import numpy as np
+import pandas as pd
+
+from models.score_grid import MAX_SCORE, province_codes
+
+# Bước điểm của từng môn (Toán, Ngoại ngữ: 50 câu; các môn khác: 40 câu hoặc tự luận)
+SUBJECT_STEPS = {
+    'toan': 0.2,
+    'ngu_van': 0.25,
+    'ngoai_ngu': 0.2,
+    'vat_li': 0.25,
+    'hoa_hoc': 0.25,
+    'sinh_hoc': 0.25,
+    'lich_su': 0.25,
+    'dia_li': 0.25,
+    'gdcd': 0.25,
+}
+
+NATURAL_SCIENCES = ['vat_li', 'hoa_hoc', 'sinh_hoc']
+SOCIAL_SCIENCES = ['lich_su', 'dia_li', 'gdcd']
+
+# Mã tỉnh hợp lệ trong SBD năm 2024 (01 - 64)
+MIN_PROVINCE = 1
+MAX_PROVINCE = 64
+
+ISSUE_NAMES = {
+    'non_numeric': 'Điểm không phải số',
+    'out_of_range': 'Điểm ngoài khoảng 0-10',
+    'off_grid': 'Điểm không đúng bước điểm của môn',
+    'duplicate_sbd': 'SBD trùng lặp',
+    'malformed_sbd': 'SBD sai định dạng hoặc mã tỉnh',
+    'mixed_combination': 'Dự thi cả KHTN và KHXH',
+    'suspicious_cluster': 'Tỉnh có tỉ lệ điểm cao bất thường',
+}
+
+
+class QualityModel:
+    """Lớp kiểm tra chất lượng dữ liệu điểm thi"""
+
+    def __init__(self, subjects_dict, high_score=9.0, z_threshold=6.0, min_cluster=30,
+                 min_takers=100):
+        """Khởi tạo model kiểm tra
+
+        Args:
+            subjects_dict: Từ điển mã môn -> tên môn của DataModel
+            high_score: Ngưỡng điểm cao dùng để phát hiện cụm bất thường
+            z_threshold: Ngưỡng z-score (theo median/MAD giữa các tỉnh) của tỉ lệ
+                điểm cao trong một tỉnh
+            min_cluster: Số thí sinh đạt điểm cao tối thiểu để xét một cụm
+            min_takers: Số thí sinh dự thi tối thiểu để tỉnh được đưa vào mốc so sánh
+        """
+        self.subjects_dict = subjects_dict
+        self.high_score = high_score
+        self.z_threshold = z_threshold
+        self.min_cluster = min_cluster
+        self.min_takers = min_takers
+
+    def scan(self, df, existing_sbd=None):
+        """Quét toàn bộ dữ liệu
+
+        Args:
+            df: DataFrame cần kiểm tra (có thể chưa chuyển điểm về kiểu số)
+            existing_sbd: Các SBD đã có sẵn, dùng khi kiểm tra dữ liệu nhập thêm
+
+        Returns:
+            dict: Tên lỗi -> {'count': số dòng lỗi, 'rows': chỉ số các dòng lỗi,
+            ...}; None nếu chưa có dữ liệu
+        """
+        if df is None:
+            return None
+
+        index = df.index.to_numpy()
+        report = {}
+
+        # Kiểm tra điểm từng môn
+        non_numeric = np.zeros(len(df), dtype=bool)
+        out_of_range = np.zeros(len(df), dtype=bool)
+        off_grid = np.zeros(len(df), dtype=bool)
+        by_subject = {key: {} for key in ('non_numeric', 'out_of_range', 'off_grid')}
+        scores = {}
+        for col, name in self.subjects_dict.items():
+            if col not in df.columns:
+                continue
+            raw = df[col]
+            values = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=float)
+            scores[col] = values
+            present = np.isfinite(values)
+
+            bad_type = raw.notna().to_numpy() & ~present
+            if not pd.api.types.is_numeric_dtype(raw):
+                # Chuỗi rỗng do nhập liệu không được coi là lỗi
+                bad_type &= raw.astype(str).str.strip().ne('').to_numpy()
+            bad_range = present & ((values < 0) | (values > MAX_SCORE))
+            steps = values / SUBJECT_STEPS.get(col, 0.25)
+            bad_grid = present & ~bad_range & (np.abs(steps - np.rint(steps)) > 1e-6)
+
+            for key, mask in (('non_numeric', bad_type), ('out_of_range', bad_range),
+                              ('off_grid', bad_grid)):
+                count = int(mask.sum())
+                if count:
+                    by_subject[key][name] = count
+            non_numeric |= bad_type
+            out_of_range |= bad_range
+            off_grid |= bad_grid
+
+        report['non_numeric'] = self._issue(index, non_numeric, by_subject=by_subject['non_numeric'])
+        report['out_of_range'] = self._issue(index, out_of_range, by_subject=by_subject['out_of_range'])
+        report['off_grid'] = self._issue(index, off_grid, by_subject=by_subject['off_grid'])
+
+        # Kiểm tra SBD
+        sbd = df['sbd']
+        duplicated = sbd.duplicated(keep=False).to_numpy()
+        if existing_sbd is not None:
+            duplicated = duplicated | sbd.isin(existing_sbd).to_numpy()
+        report['duplicate_sbd'] = self._issue(index, duplicated)
+
+        numbers = pd.to_numeric(sbd, errors='coerce').to_numpy(dtype=float)
+        provinces = province_codes(sbd)
+        malformed = (~np.isfinite(numbers) | (numbers != np.floor(numbers))
+                     | (numbers >= 100_000_000)
+                     | (provinces < MIN_PROVINCE) | (provinces > MAX_PROVINCE))
+        report['malformed_sbd'] = self._issue(index, malformed)
+
+        # Kiểm tra tổ hợp môn
+        natural = self._any_present(scores, NATURAL_SCIENCES, len(df))
+        social = self._any_present(scores, SOCIAL_SCIENCES, len(df))
+        report['mixed_combination'] = self._issue(index, natural & social)
+
+        report['suspicious_cluster'] = self._scan_clusters(index, scores, provinces, malformed)
+        return report
+
+    def _issue(self, index, mask, **extra):
+        """Tạo mục báo cáo từ mặt nạ các dòng lỗi"""
+        issue = {'count': int(mask.sum()), 'rows': index[mask]}
+        issue.update(extra)
+        return issue
+
+    def _any_present(self, scores, columns, length):
+        """Mặt nạ các dòng có điểm ít nhất một môn trong danh sách"""
+        mask = np.zeros(length, dtype=bool)
+        for col in columns:
+            if col in scores:
+                mask |= np.isfinite(scores[col])
+        return mask
+
+    def _scan_clusters(self, index, scores, provinces, malformed):
+        """Tìm các tỉnh có tỉ lệ điểm cao của một môn lớn bất thường
+
+        Mỗi tỉnh được so với mốc chung của các tỉnh (trung vị và MAD của tỉ lệ
+        điểm cao giữa các tỉnh) thay vì kiểm định nhị thức với tỉ lệ toàn quốc,
+        vì với hàng chục nghìn thí sinh mỗi tỉnh, chênh lệch vùng miền bình
+        thường cũng cho z rất lớn. Các dòng trả về là thí sinh đạt điểm cao
+        thuộc các cụm bị đánh dấu.
+        """
+        rows = np.zeros(len(index), dtype=bool)
+        clusters = []
+        valid_province = ~malformed
+        size = MAX_PROVINCE + 1
+        for col, values in scores.items():
+            present = np.isfinite(values) & valid_province
+            high = present & (values >= self.high_score)
+            takers = np.bincount(provinces[present], minlength=size)
+            highs = np.bincount(provinces[high], minlength=size)
+            eligible = takers >= self.min_takers
+            if eligible.sum() < 3:
+                continue
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rates = np.where(takers > 0, highs / takers, 0.0)
+            median = np.median(rates[eligible])
+            # Sàn 1 điểm phần trăm để tránh chia cho 0 khi các tỉnh gần như bằng nhau
+            scale = max(1.4826 * np.median(np.abs(rates[eligible] - median)), 0.01)
+            z = (rates - median) / scale
+            flagged = np.flatnonzero(eligible & (highs >= self.min_cluster) & (z > self.z_threshold))
+            for province in flagged:
+                clusters.append({
+                    'province': int(province),
+                    'subject': self.subjects_dict[col],
+                    'count': int(highs[province]),
+                    'rate': rates[province] * 100,
+                    'median_rate': median * 100,
+                    'z': float(z[province]),
+                })
+            if len(flagged):
+                rows |= high & np.isin(provinces, flagged)
+
+        return self._issue(index, rows, clusters=clusters)
+
+    def summarize(self, report):
+        """Tóm tắt báo cáo thành các dòng văn bản, rỗng nếu không có lỗi"""
+        if not report:
+            return []
+
+        lines = []
+        for key, name in ISSUE_NAMES.items():
+            issue = report.get(key)
+            if not issue or issue['count'] == 0:
+                continue
+            line = f"{name}: {issue['count']} dòng"
+            if issue.get('by_subject'):
+                details = ", ".join(f"{subject} {count}" for subject, count in issue['by_subject'].items())
+                line += f" ({details})"
+            if issue.get('clusters'):
+                details = ", ".join(f"tỉnh {c['province']:02d} - {c['subject']}" for c in issue['clusters'])
+                line += f" ({details})"
+            lines.append(line)
+        return lines
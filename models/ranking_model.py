@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module xếp hạng thí sinh
+
+Module này chứa lớp RankingModel lưu số lượng thí sinh theo từng ô của lưới
+điểm (theo môn, theo khối và theo tỉnh). Từ các mảng đếm tích lũy có thể trả
+lời thứ hạng toàn quốc, thứ hạng trong tỉnh, số thí sinh bằng điểm và bách
+phân vị của một thí sinh trong O(1) mà không cần sắp xếp dữ liệu.
+"""
+
+import numpy as np
+import pandas as pd
+
+from models.score_grid import (BLOCKS, BLOCK_GRID_SIZE, MAX_BLOCK_SCORE,
+                               PROVINCE_COUNT, SUBJECT_GRID_SIZE, grid_to_score,
+                               province_codes, to_grid_index)
+
+
+class RankingModel:
+    """Lớp xếp hạng thí sinh theo lưới điểm"""
+
+    def __init__(self, subjects_dict):
+        """Khởi tạo bảng xếp hạng
+
+        Args:
+            subjects_dict: Từ điển mã môn -> tên môn của DataModel
+        """
+        self.subjects_dict = subjects_dict
+        # Số thí sinh theo (tỉnh, ô lưới) cho từng môn/khối
+        self._counts = {}
+        # Mảng tích lũy, tính lại khi cần sau mỗi lần thay đổi
+        self._cumulative = {}
+
+    def _keys(self):
+        """Danh sách các môn và khối được xếp hạng"""
+        return list(self.subjects_dict.keys()) + list(BLOCKS.keys())
+
+    def _grid_size(self, key):
+        """Số ô lưới của một môn hoặc khối"""
+        return BLOCK_GRID_SIZE if key in BLOCKS else SUBJECT_GRID_SIZE
+
+    def _grid_indices(self, df, key):
+        """Tính chỉ số lưới của môn hoặc khối cho các dòng dữ liệu"""
+        if key in BLOCKS:
+            scores = df[BLOCKS[key]].apply(pd.to_numeric, errors='coerce')
+            totals = scores.sum(axis=1, min_count=len(BLOCKS[key]))
+            return to_grid_index(totals, MAX_BLOCK_SCORE)
+        return to_grid_index(pd.to_numeric(df[key], errors='coerce'))
+
+    def build(self, df):
+        """Xây dựng lại bảng xếp hạng từ toàn bộ dữ liệu"""
+        self._counts = {}
+        self._cumulative = {}
+        if df is None:
+            return
+        for key in self._keys():
+            size = self._grid_size(key)
+            self._counts[key] = np.zeros((PROVINCE_COUNT, size), dtype=np.int64)
+        self._apply(df, 1)
+
+    def add_rows(self, rows):
+        """Cập nhật bảng xếp hạng khi thêm các dòng dữ liệu"""
+        self._apply(rows, 1)
+
+    def remove_rows(self, rows):
+        """Cập nhật bảng xếp hạng khi xóa các dòng dữ liệu"""
+        self._apply(rows, -1)
+
+    def _apply(self, rows, sign):
+        """Cộng (sign=1) hoặc trừ (sign=-1) các dòng vào mảng đếm"""
+        if not self._counts or rows is None or len(rows) == 0:
+            return
+        provinces = province_codes(rows['sbd'])
+        for key in self._keys():
+            size = self._grid_size(key)
+            idx = self._grid_indices(rows, key)
+            valid = idx >= 0
+            flat = provinces[valid].astype(np.int64) * size + idx[valid]
+            delta = np.bincount(flat, minlength=PROVINCE_COUNT * size)
+            self._counts[key] += sign * delta.reshape(PROVINCE_COUNT, size)
+            self._cumulative.pop(key, None)
+
+    def has_data(self):
+        """Kiểm tra bảng xếp hạng đã được xây dựng chưa"""
+        return bool(self._counts)
+
+    def get_counts(self, key):
+        """Lấy mảng đếm thí sinh theo (mã tỉnh, ô lưới) của một môn hoặc khối"""
+        return self._counts[key]
+
+    def _get_cumulative(self, key):
+        """Lấy số thí sinh có điểm thấp hơn từng ô lưới (toàn quốc và theo tỉnh)"""
+        if key not in self._cumulative:
+            counts = self._counts[key]
+            national = counts.sum(axis=0)
+            national_below = np.concatenate(([0], np.cumsum(national)[:-1]))
+            province_below = np.zeros_like(counts)
+            province_below[:, 1:] = np.cumsum(counts, axis=1)[:, :-1]
+            self._cumulative[key] = (national, national_below,
+                                     counts.sum(axis=1), province_below)
+        return self._cumulative[key]
+
+    def get_rank(self, student):
+        """Lấy thứ hạng của một thí sinh theo từng môn và khối
+
+        Args:
+            student: Series thông tin thí sinh (kết quả của search_by_sbd)
+
+        Returns:
+            dict: Tên môn/khối -> thông tin xếp hạng, None nếu chưa có dữ liệu
+        """
+        if student is None or not self._counts:
+            return None
+
+        row = student.to_frame().T
+        province = int(province_codes(row['sbd'])[0])
+        ranks = {}
+        for key in self._keys():
+            index = int(self._grid_indices(row, key)[0])
+            if index < 0:
+                continue
+
+            national, national_below, province_totals, province_below = \
+                self._get_cumulative(key)
+            national_total = int(national_below[-1] + national[-1])
+            province_total = int(province_totals[province])
+            equal_count = int(national[index])
+            national_above = national_total - int(national_below[index]) - equal_count
+            province_above = (province_total - int(province_below[province, index])
+                              - int(self._counts[key][province, index]))
+
+            name = f"Khối {key}" if key in BLOCKS else self.subjects_dict[key]
+            ranks[name] = {
+                'score': grid_to_score(index),
+                'national_rank': national_above + 1,
+                'national_total': national_total,
+                'province': province,
+                'province_rank': province_above + 1,
+                'province_total': province_total,
+                'equal_count': equal_count,
+                'percentile': (int(national_below[index]) / national_total * 100
+                               if national_total > 0 else 0),
+            }
+
+        return ranks
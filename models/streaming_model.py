@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module xử lý dữ liệu điểm thi theo luồng (out-of-core)
+
+Module này chứa lớp StreamingModel đọc file CSV theo từng khối dòng có kích
+thước cố định thay vì tải toàn bộ vào bộ nhớ. Các thống kê tổng quan, phân
+phối điểm và phân vị được cộng dồn trên lưới điểm; xuất dữ liệu đã lọc ghi
+trực tiếp từng khối ra file; tra cứu SBD dùng chỉ mục sắp xếp lưu trên đĩa.
+"""
+
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from models.score_grid import GRID_STEP, SUBJECT_GRID_SIZE, to_grid_index
+
+# Bộ nhớ cho mỗi ô khi đọc CSV theo khối (dữ liệu + bộ đệm của trình đọc). Đo
+# được khoảng 35-40 byte/ô với file năm 2024, lấy gấp đôi để dự phòng
+CELL_BYTES = 80
+
+# Kích thước tối đa của khối byte khi quét file để lập chỉ mục
+SCAN_BLOCK_BYTES = 8 * 1024 * 1024
+
+INDEX_DTYPE = np.dtype([('sbd', '<i8'), ('offset', '<i8')])
+
+
+class StreamingModel:
+    """Lớp xử lý dữ liệu điểm thi theo luồng"""
+
+    def __init__(self, file_path, subjects_dict, memory_budget_mb=256, chunk_size=None):
+        """Khởi tạo model xử lý theo luồng
+
+        Args:
+            file_path: Đường dẫn file CSV
+            subjects_dict: Từ điển mã môn -> tên môn của DataModel
+            memory_budget_mb: Giới hạn bộ nhớ làm việc (MB), không tính phần nền
+                của trình thông dịch và các thư viện đã nạp
+            chunk_size: Số dòng mỗi khối, mặc định tính từ memory_budget_mb
+        """
+        self.file_path = file_path
+        self.subjects_dict = subjects_dict
+        self.memory_budget_mb = memory_budget_mb
+        budget = memory_budget_mb * 1024 * 1024
+        if chunk_size is None:
+            columns = len(pd.read_csv(file_path, nrows=0).columns)
+            chunk_size = max(1_000, budget // (CELL_BYTES * max(columns, 1)))
+        self.chunk_size = chunk_size
+        # Khối byte khi quét file và số dòng chỉ mục được giữ trong bộ nhớ khi trộn
+        self.scan_block_bytes = min(SCAN_BLOCK_BYTES, budget // 16)
+        self.merge_rows = max(1_000, budget // (8 * INDEX_DTYPE.itemsize))
+        self.index_path = os.path.splitext(file_path)[0] + ".sbd_index.npy"
+        # Kết quả đã tính được gắn với thời điểm sửa file CSV tương ứng
+        self._stats = None
+        self._stats_mtime = None
+        self._index = None
+        self._index_mtime = None
+
+    def iter_chunks(self, usecols=None):
+        """Đọc file CSV theo từng khối, chuyển các cột điểm về kiểu số"""
+        for chunk in pd.read_csv(self.file_path, chunksize=self.chunk_size, usecols=usecols):
+            for col in self.subjects_dict:
+                if col in chunk.columns:
+                    chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+            yield chunk
+
+    def _collect_stats(self):
+        """Cộng dồn số lượng, tổng, tổng bình phương và phân phối lưới của từng môn"""
+        mtime = os.path.getmtime(self.file_path)
+        if self._stats is not None and self._stats_mtime == mtime:
+            return self._stats
+
+        columns = list(self.subjects_dict)
+        stats = {
+            'total_students': 0,
+            'count': dict.fromkeys(columns, 0),
+            'sum': dict.fromkeys(columns, 0.0),
+            'sum_sq': dict.fromkeys(columns, 0.0),
+            'min': dict.fromkeys(columns, np.nan),
+            'max': dict.fromkeys(columns, np.nan),
+            'grid': {col: np.zeros(SUBJECT_GRID_SIZE, dtype=np.int64) for col in columns},
+        }
+        for chunk in self.iter_chunks(usecols=['sbd'] + columns):
+            stats['total_students'] += len(chunk)
+            for col in columns:
+                values = chunk[col].to_numpy(dtype=float)
+                values = values[np.isfinite(values)]
+                if len(values) == 0:
+                    continue
+                stats['count'][col] += len(values)
+                stats['sum'][col] += values.sum()
+                stats['sum_sq'][col] += (values * values).sum()
+                stats['min'][col] = np.fmin(stats['min'][col], values.min())
+                stats['max'][col] = np.fmax(stats['max'][col], values.max())
+                idx = to_grid_index(values)
+                stats['grid'][col] += np.bincount(idx[idx >= 0], minlength=SUBJECT_GRID_SIZE)
+
+        self._stats = stats
+        self._stats_mtime = mtime
+        return stats
+
+    def get_overview_stats(self):
+        """Lấy thống kê tổng quan (cùng cấu trúc với DataModel.get_overview_stats)"""
+        data = self._collect_stats()
+        total = data['total_students']
+        stats = {'total_students': total, 'subject_counts': {},
+                 'subject_means': {}, 'subject_max': {}}
+        for col, name in self.subjects_dict.items():
+            count = data['count'][col]
+            stats['subject_counts'][name] = (count, count / total * 100 if total > 0 else 0)
+            stats['subject_means'][name] = data['sum'][col] / count if count > 0 else None
+            stats['subject_max'][name] = data['max'][col] if count > 0 else None
+        return stats
+
+    def get_histogram(self, subject_col):
+        """Lấy số thí sinh theo từng ô lưới điểm của một môn"""
+        return self._collect_stats()['grid'][subject_col]
+
+    def get_quantiles(self, subject_col, quantiles):
+        """Tính phân vị điểm của một môn từ phân phối trên lưới điểm
+
+        Returns:
+            list: Điểm tại từng phân vị (0-1), None nếu môn không có dữ liệu
+        """
+        cumulative = np.cumsum(self.get_histogram(subject_col))
+        if cumulative[-1] == 0:
+            return None
+        ranks = np.ceil(np.asarray(quantiles, dtype=float) * cumulative[-1]).clip(1, None)
+        idx = np.searchsorted(cumulative, ranks)
+        return [round(float(i) * GRID_STEP, 2) for i in idx]
+
+    def analyze_subject(self, subject_col):
+        """Phân tích thống kê một môn (cùng cấu trúc với DataModel.analyze_subject)"""
+        data = self._collect_stats()
+        count = data['count'][subject_col]
+        if count == 0:
+            return None
+
+        mean = data['sum'][subject_col] / count
+        variance = (data['sum_sq'][subject_col] - count * mean * mean) / (count - 1) if count > 1 else np.nan
+        stats = {
+            'count': count,
+            'mean': mean,
+            'median': self.get_quantiles(subject_col, [0.5])[0],
+            'std': np.sqrt(max(variance, 0)) if count > 1 else np.nan,
+            'min': data['min'][subject_col],
+            'max': data['max'][subject_col],
+            'distribution': [],
+        }
+
+        # Gộp lưới điểm về các khoảng 1 điểm như np.histogram (khoảng cuối gồm cả điểm 10)
+        hist = self.get_histogram(subject_col)
+        cells = int(round(1 / GRID_STEP))
+        for i in range(10):
+            end = (i + 1) * cells + (1 if i == 9 else 0)
+            bin_count = int(hist[i * cells:end].sum())
+            stats['distribution'].append({
+                'range': (i, i + 1),
+                'count': bin_count,
+                'percentage': bin_count / count * 100,
+            })
+        return stats
+
+    def export_filtered(self, output_path, column, value, condition='equal'):
+        """Lọc dữ liệu và ghi kết quả ra file CSV theo từng khối
+
+        Returns:
+            int: Số dòng đã ghi
+        """
+        written = 0
+        header = True
+        for chunk in self.iter_chunks():
+            if condition == 'equal':
+                filtered = chunk[chunk[column] == value]
+            elif condition == 'greater':
+                filtered = chunk[chunk[column] > value]
+            elif condition == 'less':
+                filtered = chunk[chunk[column] < value]
+            elif condition == 'contains':
+                filtered = chunk[chunk[column].astype(str).str.contains(str(value), na=False)]
+            else:
+                raise ValueError(f"Điều kiện lọc không hợp lệ: {condition}")
+
+            filtered.to_csv(output_path, mode='w' if header else 'a', header=header, index=False)
+            header = False
+            written += len(filtered)
+        return written
+
+    def build_index(self):
+        """Lập chỉ mục SBD sắp xếp lưu trên đĩa
+
+        Chỉ mục gồm các cặp (SBD, vị trí byte đầu dòng) được sắp xếp ngoài bộ
+        nhớ: từng khối dòng được sắp xếp rồi ghi ra file tạm, sau đó các đoạn
+        được trộn dần vào file .npy, nên bộ nhớ dùng không phụ thuộc kích
+        thước file.
+        """
+        offsets_path = self.index_path + ".offsets.tmp"
+        runs_path = self.index_path + ".runs.tmp"
+        try:
+            total = 0
+            with open(offsets_path, 'wb') as f:
+                for starts in self._iter_line_offsets():
+                    starts.tofile(f)
+                    total += len(starts)
+
+            runs = self._write_sorted_runs(offsets_path, runs_path, total)
+            self._merge_runs(runs_path, runs, total)
+        except Exception:
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+            raise
+        finally:
+            for path in (offsets_path, runs_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        self._index = None
+
+    def _write_sorted_runs(self, offsets_path, runs_path, total):
+        """Ghép SBD với vị trí dòng, sắp xếp từng đoạn và ghi ra file tạm
+
+        Returns:
+            list: Vị trí (đầu, cuối) của từng đoạn trong file tạm
+        """
+        runs = []
+        position = 0
+        with open(offsets_path, 'rb') as offsets, open(runs_path, 'wb') as out:
+            for chunk in pd.read_csv(self.file_path, usecols=['sbd'], chunksize=self.chunk_size):
+                sbd = pd.to_numeric(chunk['sbd'], errors='coerce').fillna(-1).to_numpy(dtype=np.int64)
+                starts = np.frombuffer(offsets.read(len(sbd) * 8), dtype=np.int64)
+                if len(starts) != len(sbd):
+                    raise ValueError("Số dòng dữ liệu không khớp khi lập chỉ mục")
+
+                run = np.empty(len(sbd), dtype=INDEX_DTYPE)
+                run['sbd'] = sbd
+                run['offset'] = starts
+                run[np.argsort(sbd, kind='stable')].tofile(out)
+                runs.append((position, position + len(run)))
+                position += len(run)
+
+        if position != total:
+            raise ValueError("Số dòng dữ liệu không khớp khi lập chỉ mục")
+        return runs
+
+    def _merge_runs(self, runs_path, runs, total):
+        """Trộn các đoạn đã sắp xếp thành file chỉ mục .npy
+
+        Mỗi đoạn chỉ được đọc từng phần nhỏ. Ở mỗi bước, các SBD không lớn hơn
+        SBD cuối nhỏ nhất trong các phần đang đọc (của đoạn còn dữ liệu) chắc
+        chắn đã có trong bộ nhớ nên được sắp xếp và ghi ra trước.
+        """
+        itemsize = INDEX_DTYPE.itemsize
+        piece_rows = max(100, self.merge_rows // max(len(runs), 1))
+        positions = [start for start, _ in runs]
+        pieces = [np.empty(0, dtype=INDEX_DTYPE) for _ in runs]
+        header = {'descr': np.lib.format.dtype_to_descr(INDEX_DTYPE),
+                  'fortran_order': False, 'shape': (total,)}
+        with open(runs_path, 'rb') as source, open(self.index_path, 'wb') as out:
+            np.lib.format.write_array_header_1_0(out, header)
+            while True:
+                for i, (_, end) in enumerate(runs):
+                    if len(pieces[i]) == 0 and positions[i] < end:
+                        count = min(piece_rows, end - positions[i])
+                        source.seek(positions[i] * itemsize)
+                        pieces[i] = np.frombuffer(source.read(count * itemsize), dtype=INDEX_DTYPE)
+                        positions[i] += count
+
+                pending = [pieces[i]['sbd'][-1] for i, (_, end) in enumerate(runs)
+                           if positions[i] < end]
+                bound = min(pending) if pending else None
+                heads = []
+                for i, piece in enumerate(pieces):
+                    split = len(piece) if bound is None else int(
+                        np.searchsorted(piece['sbd'], bound, side='right'))
+                    heads.append(piece[:split])
+                    pieces[i] = piece[split:]
+
+                merged = np.concatenate(heads) if heads else np.empty(0, dtype=INDEX_DTYPE)
+                merged[np.argsort(merged['sbd'], kind='stable')].tofile(out)
+                if bound is None:
+                    break
+
+    def _iter_line_offsets(self):
+        """Duyệt vị trí byte đầu mỗi dòng dữ liệu theo từng khối
+
+        Bỏ qua dòng tiêu đề và các dòng trống hoặc chỉ có khoảng trắng (pandas
+        cũng bỏ qua các dòng này) để số vị trí khớp với số dòng đọc được.
+        """
+        with open(self.file_path, 'rb') as f:
+            base = len(f.readline())
+            carry = b''
+            while True:
+                block = f.read(self.scan_block_bytes)
+                if block:
+                    data = carry + block
+                elif carry:
+                    # Dòng cuối không có ký tự xuống dòng
+                    data = carry + b'\n'
+                else:
+                    break
+                raw = np.frombuffer(data, dtype=np.uint8)
+                newlines = np.flatnonzero(raw == ord('\n'))
+                if len(newlines) == 0:
+                    carry = data
+                    continue
+
+                # Chỉ xét các dòng đã trọn vẹn, phần còn lại ghép vào khối sau
+                end = int(newlines[-1]) + 1
+                starts = np.concatenate(([0], newlines[:-1] + 1))
+                # Dòng trống là dòng chỉ gồm khoảng trắng và ký tự điều khiển (\t, \r)
+                content = raw[:end] > ord(' ')
+                keep = np.logical_or.reduceat(content, starts)
+                yield starts[keep].astype(np.int64) + base
+                base += end
+                carry = data[end:]
+                if not block:
+                    break
+
+    def _get_index(self):
+        """Mở chỉ mục SBD (chỉ đọc), lập chỉ mục nếu chưa có hoặc đã cũ"""
+        mtime = os.path.getmtime(self.file_path)
+        if self._index is None or self._index_mtime != mtime:
+            self._index = None
+            if (not os.path.exists(self.index_path)
+                    or os.path.getmtime(self.index_path) < mtime):
+                self.build_index()
+            self._index = np.load(self.index_path, mmap_mode='r')
+            self._index_mtime = mtime
+        return self._index
+
+    def search_by_sbd(self, sbd):
+        """Tìm thí sinh theo SBD bằng chỉ mục trên đĩa
+
+        Returns:
+            Series: Thông tin thí sinh, None nếu không tìm thấy
+        """
+        try:
+            key = int(sbd)
+        except (TypeError, ValueError):
+            return None
+
+        index = self._get_index()
+        position = np.searchsorted(index['sbd'], key)
+        if position >= len(index) or index['sbd'][position] != key:
+            return None
+
+        with open(self.file_path, 'rb') as f:
+            header = f.readline()
+            f.seek(int(index['offset'][position]))
+            line = f.readline()
+        row = pd.read_csv(io.BytesIO(header + line))
+        for col in self.subjects_dict:
+            if col in row.columns:
+                row[col] = pd.to_numeric(row[col], errors='coerce')
+        return row.iloc[0]